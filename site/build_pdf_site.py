@@ -1,22 +1,44 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import html
+import io
+import json
 import os
+import pickle
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from typing import Iterable
 
 import fitz  # PyMuPDF
 
 
+_SPAN_TMPL = (
+    '<span class="txt" style="left:{:.3f}px;top:{:.3f}px;'
+    'width:{:.3f}px;height:{:.3f}px;font-size:{:.3f}px;color:{};">{}</span>'
+)
+
+
 def _css_color_from_int(color: int) -> str:
     # PyMuPDF returns sRGB packed int (0xRRGGBB)
     return f"#{color & 0xFFFFFF:06x}"
 
 
-def _iter_text_spans(page: fitz.Page) -> Iterable[dict]:
-    # "rawdict" has more precise span data across versions.
-    raw = page.get_text("rawdict")
+@dataclass(frozen=True, slots=True)
+class Span:
+    # Only the span fields the page HTML uses; PyMuPDF's span dicts carry many more.
+    text: str
+    bbox: tuple[float, float, float, float]
+    size: float
+    color: int
+
+
+def _iter_text_spans(page: fitz.Page) -> Iterable[Span]:
+    # "dict" gives span-level text/bbox/size/color without the per-char arrays of "rawdict".
+    raw = page.get_text("dict")
     for block in raw.get("blocks", []):
         if block.get("type") != 0:
             continue
@@ -25,7 +47,12 @@ def _iter_text_spans(page: fitz.Page) -> Iterable[dict]:
                 text = span.get("text", "")
                 if not text.strip():
                     continue
-                yield span
+                yield Span(
+                    text=text,
+                    bbox=tuple(span.get("bbox", (0, 0, 0, 0))),
+                    size=float(span.get("size", 10.0)),
+                    color=int(span.get("color", 0)),
+                )
 
 
 def _write_index(out_dir: Path, page_count: int, start: int, end: int) -> None:
@@ -56,56 +83,57 @@ def _write_index(out_dir: Path, page_count: int, start: int, end: int) -> None:
     (out_dir / "index.html").write_text(index_html, encoding="utf-8")
 
 
-def _write_page_html(
+def _render_page_html(
     *,
-    out_pages_dir: Path,
     page_num: int,
     page_w: float,
     page_h: float,
     scale: float,
     image_rel_path: str,
-    spans: list[dict],
+    spans: list[Span],
     total_pages: int,
-) -> None:
+) -> str:
     css_w = page_w * scale
     css_h = page_h * scale
 
     prev_link = f"{page_num - 1:04d}.html" if page_num > 1 else None
     next_link = f"{page_num + 1:04d}.html" if page_num < total_pages else None
 
-    nav_bits = [
-        '<a href="../index.html">Index</a>',
-        f"<span>Page {page_num} / {total_pages}</span>",
-    ]
+    nav = io.StringIO()
+    nav.write('<a href="../index.html">Index</a>')
     if prev_link:
-        nav_bits.insert(1, f'<a href="{prev_link}">Prev</a>')
+        nav.write(f' <a href="{prev_link}">Prev</a>')
+    nav.write(f" <span>Page {page_num} / {total_pages}</span>")
     if next_link:
-        nav_bits.append(f'<a href="{next_link}">Next</a>')
-
-    span_divs: list[str] = []
+        nav.write(f' <a href="{next_link}">Next</a>')
+
+    # Write span markup straight into one buffer rather than building a str per span.
+    # Hot names are bound to locals; pages reuse a handful of colors, so cache those too.
+    buf = io.StringIO()
+    write = buf.write
+    fmt = _SPAN_TMPL.format
+    escape = html.escape
+    color_cache: dict[int, str] = {}
     for span in spans:
-        x0, y0, x1, y1 = span.get("bbox", (0, 0, 0, 0))
-        text = span.get("text", "")
-        if not text:
-            continue
-
-        size = float(span.get("size", 10.0)) * scale
-        color = _css_color_from_int(int(span.get("color", 0)))
-
-        left = x0 * scale
-        top = y0 * scale
-        width = max((x1 - x0) * scale, 0.0)
-        height = max((y1 - y0) * scale, 0.0)
-
-        safe = html.escape(text)
-        style = (
-            f"left:{left:.3f}px;top:{top:.3f}px;"
-            f"width:{width:.3f}px;height:{height:.3f}px;"
-            f"font-size:{size:.3f}px;color:{color};"
+        x0, y0, x1, y1 = span.bbox
+
+        color = color_cache.get(span.color)
+        if color is None:
+            color = color_cache[span.color] = _css_color_from_int(span.color)
+
+        write(
+            fmt(
+                x0 * scale,
+                y0 * scale,
+                max((x1 - x0) * scale, 0.0),
+                max((y1 - y0) * scale, 0.0),
+                span.size * scale,
+                color,
+                escape(span.text),
+            )
         )
-        span_divs.append(f'<span class="txt" style="{style}">{safe}</span>')
 
-    page_html = f"""<!doctype html>
+    return f"""<!doctype html>
 <html lang=\"en\">
 <head>
   <meta charset=\"utf-8\"/>
@@ -115,33 +143,94 @@ def _write_page_html(
 </head>
 <body>
   <div class=\"topbar\"><div class=\"inner\">
-    {' '.join(nav_bits)}
+    {nav.getvalue()}
   </div></div>
 
   <div class=\"page-wrap\">
     <div class=\"page\" style=\"width:{css_w:.3f}px;height:{css_h:.3f}px\">
       <img class=\"bg\" alt=\"Page {page_num}\" src=\"../{image_rel_path}\" width=\"{css_w:.0f}\" height=\"{css_h:.0f}\"/>
-      {''.join(span_divs)}
+      {buf.getvalue()}
     </div>
   </div>
 </body>
 </html>
 """
 
-    (out_pages_dir / f"{page_num:04d}.html").write_text(page_html, encoding="utf-8")
 
+# Bump when _render_page_html's markup changes so cached pages are regenerated.
+_HTML_CACHE_VERSION = 1
+
+
+def _page_html_key(*, scale: float, page_w: float, page_h: float, total_pages: int, spans: list[Span]) -> str:
+    payload = pickle.dumps((_HTML_CACHE_VERSION, scale, page_w, page_h, total_pages, spans))
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
 
-def _save_page_image(page: fitz.Page, out_path: Path, scale: float, jpg_quality: int) -> None:
+
+def _encode_page_jpeg(page: fitz.Page, scale: float, jpg_quality: int) -> bytes:
     mat = fitz.Matrix(scale, scale)
     pix = page.get_pixmap(matrix=mat, alpha=False)
 
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-
     # PyMuPDF supports jpg_quality on newer versions; keep a safe fallback.
     try:
-        pix.save(str(out_path), jpg_quality=jpg_quality)
+        return pix.tobytes("jpeg", jpg_quality=jpg_quality)
     except TypeError:
-        pix.save(str(out_path))
+        return pix.tobytes("jpeg")
+
+
+def _write_text_stat(path: Path, text: str) -> os.stat_result:
+    path.write_text(text, encoding="utf-8")
+    return path.stat()
+
+
+# Per-process document handle; PyMuPDF documents can't be shared across processes.
+_worker_doc: fitz.Document | None = None
+
+
+def _init_worker(pdf_path: str) -> None:
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+
+def _page_fingerprint(page: fitz.Page, scale: float, jpg_quality: int) -> str:
+    # Content stream, the resources it draws and render settings; unchanged pages keep their
+    # image across PDF revisions. A resource can change while the content stream still just
+    # says "/Im0 Do", so images, soft masks, form XObjects and fonts are hashed too.
+    doc = page.parent
+    h = hashlib.sha1(page.read_contents())
+    xrefs = set()
+    for img in page.get_images(full=True):
+        xrefs.update(img[:2])
+    xrefs.update(xobj[0] for xobj in page.get_xobjects())
+    fonts = {font[0] for font in page.get_fonts(full=True)}
+    for xref in sorted((xrefs | fonts) - {0}):
+        try:
+            h.update(doc.xref_object(xref, compressed=True).encode("utf-8"))
+            if doc.xref_is_stream(xref):
+                h.update(doc.xref_stream_raw(xref))
+            if xref in fonts:
+                # The font program lives in the descriptor's FontFile stream, not the font dict.
+                h.update(doc.extract_font(xref)[3] or b"")
+        except Exception:
+            h.update(b"?")
+    h.update(f"|{scale}|{jpg_quality}".encode("ascii"))
+    return h.hexdigest()
+
+
+def _process_page(
+    page_num: int,
+    known_fingerprint: str | None,
+    scale: float,
+    jpg_quality: int,
+) -> tuple[int, float, float, list[Span], str, bytes | None]:
+    # Encoding stays in the worker; the parent does the disk write.
+    assert _worker_doc is not None, "worker not initialized"
+    page = _worker_doc[page_num - 1]
+
+    fingerprint = _page_fingerprint(page, scale, jpg_quality)
+    jpeg = _encode_page_jpeg(page, scale, jpg_quality) if fingerprint != known_fingerprint else None
+
+    spans = list(_iter_text_spans(page))
+    return page_num, float(page.rect.width), float(page.rect.height), spans, fingerprint, jpeg
 
 
 def main() -> int:
@@ -152,6 +241,12 @@ def main() -> int:
     parser.add_argument("--jpg-quality", type=int, default=70, help="JPEG quality (1-100)")
     parser.add_argument("--start", type=int, default=1, help="Start page number (1-based)")
     parser.add_argument("--end", type=int, default=0, help="End page number (1-based); 0 means last")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(os.cpu_count() or 1, 4),
+        help="Worker processes for page rendering (1 disables multiprocessing)",
+    )
     args = parser.parse_args()
 
     pdf_path = Path(args.pdf)
@@ -165,8 +260,8 @@ def main() -> int:
     out_pages_dir.mkdir(parents=True, exist_ok=True)
     out_img_dir.mkdir(parents=True, exist_ok=True)
 
-    doc = fitz.open(pdf_path)
-    total_pages = doc.page_count
+    with fitz.open(pdf_path) as doc:
+        total_pages = doc.page_count
 
     start = max(1, int(args.start))
     end = int(args.end) if int(args.end) > 0 else total_pages
@@ -178,34 +273,87 @@ def main() -> int:
     # index.html links only the generated subset
     _write_index(out_dir, total_pages, start, end)
 
-    for page_num in range(start, end + 1):
-        page = doc[page_num - 1]
-        page_w = float(page.rect.width)
-        page_h = float(page.rect.height)
-
-        img_name = f"{page_num:04d}.jpg"
-        img_path = out_img_dir / img_name
-        img_rel = f"assets/page-images/{img_name}"
-
-        # Re-generate only if missing; keeps reruns fast.
-        if not img_path.exists():
-            _save_page_image(page, img_path, args.scale, args.jpg_quality)
-
-        spans = list(_iter_text_spans(page))
-
-        _write_page_html(
-            out_pages_dir=out_pages_dir,
-            page_num=page_num,
-            page_w=page_w,
-            page_h=page_h,
-            scale=args.scale,
-            image_rel_path=img_rel,
-            spans=spans,
-            total_pages=total_pages,
-        )
-
-        if page_num % 25 == 0:
-            print(f"Generated page {page_num}/{end}")
+    page_nums = range(start, end + 1)
+    # Re-generate images/HTML only if missing or the page changed; keeps reruns fast.
+    # One directory read replaces a stat() per page.
+    manifest_path = out_img_dir / "manifest.json"
+    manifest: dict[str, object] = {}
+    if manifest_path.exists():
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except ValueError:
+            # Corrupt or partially written manifest; regenerate everything.
+            manifest = {}
+    existing_imgs = {entry.name for entry in os.scandir(out_img_dir)}
+    # Page HTML is tracked in git, so a checkout or hand edit can change it behind the
+    # manifest; keep size/mtime to tell whether the file is still the one we wrote.
+    existing_pages = {entry.name: entry.stat() for entry in os.scandir(out_pages_dir)}
+    known_fingerprints = [
+        manifest.get(name) if name in existing_imgs else None
+        for name in (f"{page_num:04d}.jpg" for page_num in page_nums)
+    ]
+    job = partial(_process_page, scale=args.scale, jpg_quality=args.jpg_quality)
+    workers = max(1, int(args.workers))
+
+    # HTML is rendered in the parent; image and HTML writes are I/O-bound, so overlap them on threads.
+    io_pool = ThreadPoolExecutor(max_workers=8)
+    writes: list[Future] = []
+    html_writes: list[tuple[str, str, Future]] = []
+
+    def emit(results: Iterable[tuple[int, float, float, list[Span], str, bytes | None]]) -> None:
+        for page_num, page_w, page_h, spans, fingerprint, jpeg in results:
+            if jpeg is not None:
+                writes.append(io_pool.submit((out_img_dir / f"{page_num:04d}.jpg").write_bytes, jpeg))
+            manifest[f"{page_num:04d}.jpg"] = fingerprint
+
+            # Skip pages whose HTML inputs haven't changed since the last run.
+            html_name = f"{page_num:04d}.html"
+            html_key = _page_html_key(
+                scale=args.scale,
+                page_w=page_w,
+                page_h=page_h,
+                total_pages=total_pages,
+                spans=spans,
+            )
+            st = existing_pages.get(html_name)
+            if st is None or manifest.get(html_name) != [html_key, st.st_size, st.st_mtime_ns]:
+                page_html = _render_page_html(
+                    page_num=page_num,
+                    page_w=page_w,
+                    page_h=page_h,
+                    scale=args.scale,
+                    image_rel_path=f"assets/page-images/{page_num:04d}.jpg",
+                    spans=spans,
+                    total_pages=total_pages,
+                )
+                html_writes.append(
+                    (html_name, html_key, io_pool.submit(_write_text_stat, out_pages_dir / html_name, page_html))
+                )
+
+            if page_num % 25 == 0:
+                print(f"Generated page {page_num}/{end}")
+
+    with io_pool:
+        if workers == 1:
+            _init_worker(str(pdf_path))
+            emit(map(job, page_nums, known_fingerprints))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(str(pdf_path),),
+            ) as ex:
+                # Hand pages out in blocks to amortize per-task IPC overhead.
+                emit(ex.map(job, page_nums, known_fingerprints, chunksize=8))
+
+        # Surface any write errors.
+        for fut in writes:
+            fut.result()
+        for html_name, html_key, fut in html_writes:
+            st = fut.result()
+            manifest[html_name] = [html_key, st.st_size, st.st_mtime_ns]
+
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
 
     print(f"Done. Open {out_dir / 'index.html'}")
     return 0
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
 import argparse
+import io
 import json
+import os
 import re
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
 import fitz  # PyMuPDF
 
+try:
+    import orjson  # optional, faster JSON serializer
+except ImportError:
+    orjson = None
+
 
 TOC_LINE_RE = re.compile(r"^(?P<title>.+?)\s+(?P<page>\d{1,4})\s*$")
-SECTION_PREFIX_RE = re.compile(r"^(?P<num>\d+(?:\.\d+)*)\s+\S+")
+# Matches numbered lines ("1", "1.1", "2.3.4" then text) anywhere in a newline-joined page.
+SECTION_LINE_RE = re.compile(r"^[^\S\n]*(?P<num>\d+(?:\.\d+)*)[^\S\n]+\S[^\n]*", re.MULTILINE)
+WHITESPACE_RE = re.compile(r"\s+")
 
 
 @dataclass(frozen=True)
@@ -22,7 +32,7 @@ class TocEntry:
 
 
 def _clean_line(line: str) -> str:
-    return re.sub(r"\s+", " ", line).strip(" \t\r\n\u00a0")
+    return WHITESPACE_RE.sub(" ", line).strip(" \t\r\n\u00a0")
 
 
 def _extract_outline_toc(doc: fitz.Document) -> list[TocEntry]:
@@ -35,11 +45,11 @@ def _extract_outline_toc(doc: fitz.Document) -> list[TocEntry]:
     return out
 
 
-def _find_toc_pages_by_text(doc: fitz.Document, search_max_pages: int) -> list[int]:
+def _find_toc_pages_by_text(page_texts: list[str]) -> list[int]:
     targets = ["table of contents", "contents"]
     found: list[int] = []
-    for i in range(min(search_max_pages, doc.page_count)):
-        txt = doc.load_page(i).get_text("text").lower()
+    for i, txt in enumerate(page_texts):
+        txt = txt.lower()
         if any(t in txt for t in targets):
             found.append(i)
     return found
@@ -63,77 +73,135 @@ def _parse_toc_like_lines(text: str) -> list[dict]:
     return entries
 
 
-def _extract_big_text_candidates(doc: fitz.Document, page_max: int) -> list[dict]:
-    # Heuristic: on each page, treat spans bigger than median+3 as headings.
+def _upper_median(counts: Counter[float]) -> float:
+    # Same value as sorted(values)[len(values) // 2]; a page only has a few
+    # distinct font sizes, so walk those instead of sorting every span.
+    target = sum(counts.values()) // 2
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen > target:
+            return value
+    raise ValueError("empty counts")
+
+
+# Per-process document handle; PyMuPDF documents can't be shared across processes.
+_worker_doc: fitz.Document | None = None
+
+
+def _init_worker(pdf_path: str) -> None:
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+
+def _page_text_and_spans(page: fitz.Page) -> tuple[str, dict]:
+    # One TextPage serves both plain text and the span dict, so MuPDF only
+    # analyses the page once. Image blocks aren't needed by either consumer.
+    tp = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+    text = tp.extractText()
+    raw = tp.extractDICT()
+    del tp  # release MuPDF's text page promptly
+    return text, raw
+
+
+def _scan_page(page_index: int) -> tuple[str, list[dict], list[tuple[str, str]]]:
+    """Return (page text, heading candidates, section-number matches) for one page."""
+
+    assert _worker_doc is not None, "worker not initialized"
+    text, raw = _page_text_and_spans(_worker_doc.load_page(page_index))
+
+    size_counts: Counter[float] = Counter()
+    spans: list[dict] = []
+
+    for block in raw.get("blocks", []):
+        if block.get("type") != 0:
+            continue
+        for line in block.get("lines", []):
+            for span in line.get("spans", []):
+                span_text = _clean_line(span.get("text", ""))
+                if not span_text:
+                    continue
+                size = float(span.get("size", 0.0))
+                size_counts[size] += 1
+                spans.append({"text": span_text, "size": size})
+
+    # Pull common section prefixes like 1, 1.1, 2.3.4 with one scan over the page.
+    section_matches = [
+        (m.group("num"), _clean_line(m.group(0))[:140])
+        for m in SECTION_LINE_RE.finditer(text)
+    ]
+
     candidates: list[dict] = []
+    if not size_counts:
+        return text, candidates, section_matches
 
-    for page_index in range(min(page_max, doc.page_count)):
-        page = doc.load_page(page_index)
-        raw = page.get_text("rawdict")
-        sizes: list[float] = []
-        spans: list[dict] = []
-
-        for block in raw.get("blocks", []):
-            if block.get("type") != 0:
-                continue
-            for line in block.get("lines", []):
-                for span in line.get("spans", []):
-                    text = _clean_line(span.get("text", ""))
-                    if not text:
-                        continue
-                    size = float(span.get("size", 0.0))
-                    sizes.append(size)
-                    spans.append({"text": text, "size": size})
-
-        if not sizes:
+    # Heuristic: treat spans bigger than median+3 as headings.
+    threshold = _upper_median(size_counts) + 3.0
+
+    # Keep unique headings per page, preserving order.
+    seen = set()
+    for span in spans:
+        if span["size"] < threshold:
+            continue
+        span_text = span["text"]
+        if len(span_text) < 4:
             continue
+        if span_text in seen:
+            continue
+        seen.add(span_text)
+        candidates.append({
+            "page": page_index + 1,
+            "text": span_text,
+            "size": span["size"],
+        })
+
+    return text, candidates, section_matches
+
+
+def _scan_pages(pdf_path: Path, page_count: int, workers: int) -> list[tuple[str, list[dict], list[tuple[str, str]]]]:
+    """Run _scan_page over the first page_count pages, in page order."""
+
+    page_indexes = range(page_count)
+    if workers <= 1:
+        _init_worker(str(pdf_path))
+        return list(map(_scan_page, page_indexes))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(pdf_path),),
+    ) as ex:
+        return list(ex.map(_scan_page, page_indexes, chunksize=8))
 
-        sizes_sorted = sorted(sizes)
-        median = sizes_sorted[len(sizes_sorted) // 2]
-        threshold = median + 3.0
-
-        # Keep unique headings per page, preserving order.
-        seen = set()
-        for span in spans:
-            if span["size"] < threshold:
-                continue
-            text = span["text"]
-            if len(text) < 4:
-                continue
-            if text in seen:
-                continue
-            seen.add(text)
-            candidates.append({
-                "page": page_index + 1,
-                "text": text,
-                "size": span["size"],
-            })
-
-    return candidates
-
-
-def _summarize_section_numbering(doc: fitz.Document, page_max: int) -> dict:
-    # Pull common section prefixes like 1, 1.1, 2.3.4
+
+def _summarize_scans(scans: list[tuple[str, list[dict], list[tuple[str, str]]]]) -> tuple[list[dict], dict]:
+    """Return (big-text candidates, section numbering summary) for the scanned pages."""
+
+    candidates: list[dict] = []
     counter: Counter[str] = Counter()
     examples: dict[str, str] = {}
 
-    for page_index in range(min(page_max, doc.page_count)):
-        txt = doc.load_page(page_index).get_text("text")
-        for raw_line in txt.splitlines():
-            line = _clean_line(raw_line)
-            if not line:
-                continue
-            m = SECTION_PREFIX_RE.match(line)
-            if not m:
-                continue
-            num = m.group("num")
+    for _, page_candidates, section_matches in scans:
+        candidates.extend(page_candidates)
+        for num, example in section_matches:
             counter[num] += 1
-            examples.setdefault(num, line[:140])
+            examples.setdefault(num, example)
 
     top = counter.most_common(50)
-    return {
+    section_nums = {
         "topPrefixes": [{"prefix": k, "count": v, "example": examples.get(k, "")} for k, v in top],
     }
+    return candidates, section_nums
+
+
+def _write_json(path: Path, obj: dict, *, pretty: bool) -> None:
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0))
+        return
+    with path.open("w", encoding="utf-8") as fh:
+        if pretty:
+            json.dump(obj, fh, indent=2)
+        else:
+            json.dump(obj, fh, separators=(",", ":"))
 
 
 def main() -> int:
@@ -143,21 +211,32 @@ def main() -> int:
     parser.add_argument("--out-md", required=True)
     parser.add_argument("--search-max-pages", type=int, default=40)
     parser.add_argument("--sample-pages", type=int, default=60)
+    parser.add_argument("--pretty", action="store_true", help="Indent the JSON output (larger, slower)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(os.cpu_count() or 1, 4),
+        help="Worker processes for the page scan (1 disables multiprocessing)",
+    )
     args = parser.parse_args()
 
     pdf_path = Path(args.pdf)
     doc = fitz.open(pdf_path)
 
     outline_toc = _extract_outline_toc(doc)
-    toc_pages = _find_toc_pages_by_text(doc, args.search_max_pages)
+
+    # One scan covers both the TOC search window and the heading sample window.
+    scan_count = min(max(args.search_max_pages, args.sample_pages), doc.page_count)
+    scans = _scan_pages(pdf_path, scan_count, int(args.workers))
+    page_texts = [text for text, _, _ in scans]
+
+    toc_pages = _find_toc_pages_by_text(page_texts[: args.search_max_pages])
 
     toc_like_entries: list[dict] = []
     for idx in toc_pages[:3]:
-        txt = doc.load_page(idx).get_text("text")
-        toc_like_entries.extend(_parse_toc_like_lines(txt))
+        toc_like_entries.extend(_parse_toc_like_lines(page_texts[idx]))
 
-    big_text = _extract_big_text_candidates(doc, args.sample_pages)
-    section_nums = _summarize_section_numbering(doc, args.sample_pages)
+    big_text, section_nums = _summarize_scans(scans[: args.sample_pages])
 
     result = {
         "pdf": str(pdf_path),
@@ -170,52 +249,52 @@ def main() -> int:
         "sectionNumbering": section_nums,
     }
 
-    Path(args.out_json).write_text(json.dumps(result, indent=2), encoding="utf-8")
+    _write_json(Path(args.out_json), result, pretty=args.pretty)
 
-    md_lines: list[str] = []
-    md_lines.append(f"# Extracted structure summary\n")
-    md_lines.append(f"- PDF: {pdf_path.name}")
-    md_lines.append(f"- Pages: {doc.page_count}")
+    md = io.StringIO()
+    print(f"# Extracted structure summary\n", file=md)
+    print(f"- PDF: {pdf_path.name}", file=md)
+    print(f"- Pages: {doc.page_count}", file=md)
     if result["metadata"]:
-        md_lines.append(f"- Metadata: {result['metadata']}")
+        print(f"- Metadata: {result['metadata']}", file=md)
 
-    md_lines.append("\n## Outline TOC (if present)\n")
+    print("\n## Outline TOC (if present)\n", file=md)
     if outline_toc:
         for e in outline_toc[:120]:
             indent = "  " * (e.level - 1)
-            md_lines.append(f"- {indent}p{e.page}: {e.title}")
+            print(f"- {indent}p{e.page}: {e.title}", file=md)
     else:
-        md_lines.append("- (No PDF outline TOC found)")
+        print("- (No PDF outline TOC found)", file=md)
 
-    md_lines.append("\n## TOC pages detected by text\n")
+    print("\n## TOC pages detected by text\n", file=md)
     if toc_pages:
-        md_lines.append("- " + ", ".join(str(p + 1) for p in toc_pages[:10]) + (" ..." if len(toc_pages) > 10 else ""))
+        print("- " + ", ".join(str(p + 1) for p in toc_pages[:10]) + (" ..." if len(toc_pages) > 10 else ""), file=md)
     else:
-        md_lines.append("- (No TOC page detected in first scan window)")
+        print("- (No TOC page detected in first scan window)", file=md)
 
-    md_lines.append("\n## TOC-like entries parsed from detected TOC pages\n")
+    print("\n## TOC-like entries parsed from detected TOC pages\n", file=md)
     if toc_like_entries:
         for e in toc_like_entries[:80]:
-            md_lines.append(f"- p{e['page']}: {e['title']}")
+            print(f"- p{e['page']}: {e['title']}", file=md)
     else:
-        md_lines.append("- (No TOC-like lines parsed)")
+        print("- (No TOC-like lines parsed)", file=md)
 
-    md_lines.append("\n## Big-text candidates (heading heuristic)\n")
+    print("\n## Big-text candidates (heading heuristic)\n", file=md)
     if big_text:
         for c in big_text[:80]:
-            md_lines.append(f"- p{c['page']} (size {c['size']:.1f}): {c['text']}")
+            print(f"- p{c['page']} (size {c['size']:.1f}): {c['text']}", file=md)
     else:
-        md_lines.append("- (No big-text candidates found)")
+        print("- (No big-text candidates found)", file=md)
 
-    md_lines.append("\n## Section numbering prefixes (first sample pages)\n")
+    print("\n## Section numbering prefixes (first sample pages)\n", file=md)
     prefixes = result["sectionNumbering"].get("topPrefixes", [])
     if prefixes:
         for item in prefixes[:30]:
-            md_lines.append(f"- {item['prefix']} (x{item['count']}): {item['example']}")
+            print(f"- {item['prefix']} (x{item['count']}): {item['example']}", file=md)
     else:
-        md_lines.append("- (No section numbering patterns detected)")
+        print("- (No section numbering patterns detected)", file=md)
 
-    Path(args.out_md).write_text("\n".join(md_lines) + "\n", encoding="utf-8")
+    Path(args.out_md).write_text(md.getvalue(), encoding="utf-8")
 
     print(f"Wrote {args.out_json} and {args.out_md}")
     return 0
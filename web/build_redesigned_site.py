@@ -1,15 +1,26 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import io
 import json
+import os
 import re
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import date
 from datetime import datetime
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterable
 
 import fitz  # PyMuPDF
 
+try:
+    import orjson  # optional, faster JSON parser/serializer
+except ImportError:
+    orjson = None
+
 
 @dataclass(frozen=True)
 class TocEntry:
@@ -18,38 +29,63 @@ class TocEntry:
     page: int  # 1-based
 
 
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_MULTI_NL_RE = re.compile(r"\n{3,}")
+_PARA_SPLIT_RE = re.compile(r"\n\s*\n")
+
+
 def _slugify(title: str) -> str:
-    t = title.lower().strip()
-    t = re.sub(r"&", " and ", t)
-    t = re.sub(r"[^a-z0-9]+", "-", t)
-    t = re.sub(r"-+", "-", t).strip("-")
+    t = title.lower().strip().replace("&", " and ")
+    # One pass: runs of non-alphanumerics (including dashes) collapse to a single "-".
+    t = _SLUG_RE.sub("-", t).strip("-")
     if not t:
         return "section"
     return t
 
 
+def _loads(data: bytes) -> object:
+    # Parse straight from bytes; both parsers handle the UTF-8 decode themselves.
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj: object) -> str:
+    # Compact JSON for data embedded in pages and the build cache.
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
 def _load_outline_toc(structure_json: Path) -> list[TocEntry]:
-    data = json.loads(structure_json.read_text(encoding="utf-8"))
+    data = _loads(structure_json.read_bytes())
     out: list[TocEntry] = []
     for raw in data.get("outlineToc", []):
         out.append(TocEntry(int(raw["level"]), str(raw["title"]), int(raw["page"])))
     return out
 
 
-def _filter_main_report_entries(toc: list[TocEntry]) -> list[TocEntry]:
-    # Keep entries up to (but not including) the appendices.
-    out: list[TocEntry] = []
-    for e in toc:
-        if e.title.lower().startswith("appendix"):
-            break
-        if e.title.lower() in {"table of contents", "list of tables", "list of figures"}:
-            continue
-        out.append(e)
-    return out
+_SKIP_MAIN_TITLES = frozenset({"table of contents", "list of tables", "list of figures"})
+
 
+def _classify_toc(toc: list[TocEntry]) -> tuple[list[TocEntry], list[TocEntry], list[TocEntry]]:
+    """Split the outline into (main report, appendix, level-1) entries in one pass.
 
-def _get_appendix_entries(toc: list[TocEntry]) -> list[TocEntry]:
-    return [e for e in toc if e.title.lower().startswith("appendix")]
+    Main report entries stop at the first appendix and skip the TOC/list pages.
+    """
+
+    main: list[TocEntry] = []
+    appendix: list[TocEntry] = []
+    level1: list[TocEntry] = []
+    for e in toc:
+        if e.level == 1:
+            level1.append(e)
+        title = e.title.lower()
+        if title.startswith("appendix"):
+            appendix.append(e)
+        elif not appendix and title not in _SKIP_MAIN_TITLES:
+            main.append(e)
+    return main, appendix, level1
 
 
 def _compute_ranges(entries: list[TocEntry], last_page: int) -> list[tuple[TocEntry, int]]:
@@ -62,55 +98,107 @@ def _compute_ranges(entries: list[TocEntry], last_page: int) -> list[tuple[TocEn
     return out
 
 
-def _compute_level1_title_ranges(toc: list[TocEntry], last_page: int) -> dict[str, tuple[int, int]]:
-    """Compute (start,end) page ranges for *all* level-1 outline entries.
+def _compute_level1_title_ranges_ordered(toc: list[TocEntry], last_page: int) -> list[tuple[str, int, int]]:
+    """Return (title, start, end) for *all* level-1 outline entries, in outline order.
 
-    We use this to ensure sections like "Executive Summary" stop before
-    "Table of Contents" even if we filter TOC pages from the website nav.
+    TOC/list entries are included so their neighbours' ranges stop at the right
+    page; repeated titles keep their own ranges.
     """
 
     level1 = [e for e in toc if e.level == 1]
-    ranges = _compute_ranges(level1, last_page)
-    return {e.title: (e.page, end) for e, end in ranges}
+    return [(e.title, e.page, end) for e, end in _compute_ranges(level1, last_page)]
+
+
+# Per-process document handle; PyMuPDF documents can't be shared across processes.
+_worker_doc: fitz.Document | None = None
+
+
+def _init_worker(pdf_path: str) -> None:
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path, filetype="pdf")
 
 
-def _extract_text_range(doc: fitz.Document, start_page: int, end_page: int) -> str:
-    # start/end are 1-based inclusive.
+def _harvest_page(page_index: int) -> tuple[int, str, list[tuple[int, int, int, str]]]:
+    assert _worker_doc is not None, "worker not initialized"
+    page = _worker_doc.load_page(page_index)
+    # Text-only flags: no image-block collection in the TextPage (images come from get_images).
+    text = page.get_text("text", flags=fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_IMAGES)
+    # Keep only (xref, width, height, filter) from each get_images(full=True) entry;
+    # that's all figure extraction reads, and it's less to pickle back to the parent.
+    images = [
+        (int(info[0]), int(info[2]), int(info[3]), info[8])
+        for info in page.get_images(full=True)
+    ]
+    return page_index, text, images
+
+
+def _harvest_pages(
+    pdf_path: Path,
+    page_indexes: Iterable[int],
+    workers: int,
+) -> tuple[dict[int, str], dict[int, list]]:
+    """Load each page once and collect its text and image list (keyed by 0-based index)."""
+
+    indexes = sorted(set(page_indexes))
+    if workers <= 1:
+        _init_worker(str(pdf_path))
+        results = list(map(_harvest_page, indexes))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(str(pdf_path),),
+        ) as ex:
+            # Blocks of pages per task amortize IPC; each worker reuses its own document.
+            results = list(ex.map(_harvest_page, indexes, chunksize=8))
+
+    page_texts = {i: text for i, text, _ in results}
+    page_images = {i: images for i, _, images in results}
+    return page_texts, page_images
+
+
+def _extract_text_range(page_texts: dict[int, str], start_page: int, end_page: int) -> str:
+    # start/end are 1-based inclusive; page_texts is keyed by 0-based page index.
     chunks: list[str] = []
     for p in range(start_page, end_page + 1):
-        page = doc.load_page(p - 1)
-        txt = page.get_text("text")
+        txt = page_texts[p - 1]
         # Light cleanup: normalize line endings and collapse excessive whitespace.
-        txt = txt.replace("\r\n", "\n").replace("\r", "\n")
+        # MuPDF already emits "\n"; only pay for the copies when a stray CR shows up.
+        if "\r" in txt:
+            txt = txt.replace("\r\n", "\n").replace("\r", "\n")
         chunks.append(txt.strip())
     combined = "\n\n".join(c for c in chunks if c)
-    combined = re.sub(r"\n{3,}", "\n\n", combined)
+    combined = _MULTI_NL_RE.sub("\n\n", combined)
     return combined.strip() + "\n"
 
 
-_STRIP_LINE_PATTERNS = [
-    re.compile(r"^\s*Attachment\s+\d+\s*$", re.IGNORECASE),
-    re.compile(r"^\s*IP\d{4}-\d+\s*$", re.IGNORECASE),
-    re.compile(r"^\s*ISC:\s*Unrestricted\s*$", re.IGNORECASE),
+# Report furniture dropped from extracts, as one anchored alternation (one match call per line).
+_STRIP_LINE_RE = re.compile(
+    r"^\s*(?:"
+    r"Attachment\s+\d+"
+    r"|IP\d{4}-\d+"
+    r"|ISC:\s*Unrestricted"
     # TOC/List headers that occasionally bleed into adjacent extracts.
-    re.compile(r"^\s*TABLE\s+OF\s+CONTENTS\s*$", re.IGNORECASE),
-    re.compile(r"^\s*LIST\s+OF\s+TABLES\s*$", re.IGNORECASE),
-    re.compile(r"^\s*LIST\s+OF\s+FIGURES\s*$", re.IGNORECASE),
+    r"|TABLE\s+OF\s+CONTENTS"
+    r"|LIST\s+OF\s+TABLES"
+    r"|LIST\s+OF\s+FIGURES"
     # Common TOC column labels.
-    re.compile(r"^\s*SECTION\s*$", re.IGNORECASE),
-    re.compile(r"^\s*PAGE\s+NO\.?\s*$", re.IGNORECASE),
-]
+    r"|SECTION"
+    r"|PAGE\s+NO\.?"
+    r")\s*$",
+    re.IGNORECASE,
+)
 
 
 def _clean_extracted_text(text: str) -> str:
     out_lines: list[str] = []
     for raw in text.splitlines():
         line = raw.rstrip()
-        if any(p.match(line) for p in _STRIP_LINE_PATTERNS):
+        if _STRIP_LINE_RE.match(line):
             continue
         out_lines.append(line)
     cleaned = "\n".join(out_lines)
-    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
+    cleaned = _MULTI_NL_RE.sub("\n\n", cleaned)
     return cleaned.strip() + "\n"
 
 
@@ -148,74 +236,134 @@ def _get_range_for_title(
 def _extract_images_for_range(
     *,
     doc: fitz.Document,
+    page_images: dict[int, list],
     start_page: int,
     end_page: int,
     out_dir: Path,
     section_slug: str,
+    known_figures: dict[bytes, str],
+    xref_cache: dict[int, str],
     min_pixels: int = 120_000,
     max_images: int = 30,
 ) -> list[dict]:
     """Extract embedded raster images from a page range.
 
     Returns a list of dicts with: src (relative), caption.
+
+    ``page_images`` holds each page's (xref, width, height, filter) image
+    tuples from the harvest, keyed by 0-based page index.
+
+    ``known_figures`` maps image content hashes to the src of files already
+    written by earlier calls; identical bytes are reused instead of written again.
+    ``xref_cache`` maps xrefs to srcs from earlier calls, so images on pages
+    shared by several sections are decoded only once. Captions always name the
+    page the image was found on in this range.
     """
 
     out_dir.mkdir(parents=True, exist_ok=True)
     extracted: list[dict] = []
     seen_xrefs: set[int] = set()
+    seen_srcs: set[str] = set()
+
+    # Figure writes go to a small thread pool so decoding the next image overlaps the disk I/O.
+    writes: list[Future] = []
+    with ThreadPoolExecutor(max_workers=4) as write_pool:
+        img_count = 0
+        for p in range(start_page, end_page + 1):
+            for idx, (xref, width, height, filt) in enumerate(page_images[p - 1]):
+                if xref in seen_xrefs:
+                    continue
+                seen_xrefs.add(xref)
+
+                src = xref_cache.get(xref)
+                if src is None:
+                    # Declared Width/Height come with the image list; skip icons and
+                    # glyph-sized images before anything is decoded.
+                    if width * height < min_pixels:
+                        continue
+                    if filt == "DCTDecode":
+                        # Plain JPEG streams are already browser-ready; copy them verbatim
+                        # instead of having extract_image load the image.
+                        ext = "jpeg"
+                        try:
+                            img_bytes = doc.xref_stream_raw(xref)
+                        except Exception:
+                            continue
+                    else:
+                        try:
+                            img = doc.extract_image(xref)
+                        except Exception:
+                            continue
+
+                        ext = (img.get("ext") or "png").lower()
+                        if ext not in {"png", "jpg", "jpeg"}:
+                            # Keep the scope tight; skip uncommon formats.
+                            continue
+
+                        img_bytes = img.get("image")
+
+                    if not img_bytes:
+                        continue
+
+                    digest = hashlib.blake2b(img_bytes, digest_size=16).digest()
+                    src = known_figures.get(digest)
+                    if src is None:
+                        filename = f"{section_slug}-p{p:03d}-{idx:02d}-x{xref}.{ext}"
+                        writes.append(write_pool.submit((out_dir / filename).write_bytes, img_bytes))
+                        src = known_figures[digest] = f"assets/figures/{filename}"
+                    xref_cache[xref] = src
+
+                if src in seen_srcs:
+                    # Same image re-embedded under another xref in this range.
+                    continue
+                seen_srcs.add(src)
 
-    img_count = 0
-    for p in range(start_page, end_page + 1):
-        page = doc.load_page(p - 1)
-        images = page.get_images(full=True)
-        for idx, info in enumerate(images):
-            xref = int(info[0])
-            if xref in seen_xrefs:
-                continue
-            seen_xrefs.add(xref)
-
-            try:
-                img = doc.extract_image(xref)
-            except Exception:
-                continue
-
-            width = int(img.get("width") or 0)
-            height = int(img.get("height") or 0)
-            if width * height < min_pixels:
-                continue
-
-            ext = (img.get("ext") or "png").lower()
-            if ext not in {"png", "jpg", "jpeg"}:
-                # Keep the scope tight; skip uncommon formats.
-                continue
-
-            img_bytes = img.get("image")
-            if not img_bytes:
-                continue
-
-            filename = f"{section_slug}-p{p:03d}-{idx:02d}-x{xref}.{ext}"
-            (out_dir / filename).write_bytes(img_bytes)
-
-            extracted.append(
-                {
-                    "src": f"assets/figures/{filename}",
-                    "caption": f"Extracted figure (source page {p})",
-                }
-            )
+                extracted.append({"src": src, "caption": f"Extracted figure (source page {p})"})
 
-            img_count += 1
+                img_count += 1
+                if img_count >= max_images:
+                    break
             if img_count >= max_images:
-                return extracted
+                break
+
+    # Surface any write errors.
+    for fut in writes:
+        fut.result()
 
     return extracted
 
 
+# Bump when extraction output changes so cached section extracts are rebuilt.
+_SECTION_CACHE_VERSION = 2
+
+
+def _load_cache(cache_path: Path) -> dict:
+    if not cache_path.exists():
+        return {}
+    try:
+        return _loads(cache_path.read_bytes())
+    except ValueError:
+        # Corrupt or partially written cache; start over.
+        return {}
+
+
+def _save_cache(cache_path: Path, obj: dict) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(_dumps(obj), encoding="utf-8")
+
+
+# Minimal HTML escaping plus line breaks, applied in one translate pass.
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", "\n": "<br/>"})
+
+
+# Section extracts recur across pages (hub pages reuse the same sections), so memoize.
+@lru_cache(maxsize=64)
 def _text_to_html_paragraphs(text: str) -> str:
     # Minimal text → HTML with basic bullet list support.
-    paras = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    paras = [p.strip() for p in _PARA_SPLIT_RE.split(text) if p.strip()]
 
     def esc(s: str) -> str:
-        return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        return s.translate(_HTML_ESCAPE_TABLE)
 
     html_blocks: list[str] = []
     for p in paras:
@@ -230,8 +378,8 @@ def _text_to_html_paragraphs(text: str) -> str:
                 html_blocks.append(f"<p>{esc(' '.join(non_bullets))}</p>")
             continue
 
-        escaped = esc(p).replace("\n", "<br/>")
-        html_blocks.append(f"<p>{escaped}</p>")
+        # esc() also turns the remaining newlines into <br/>.
+        html_blocks.append(f"<p>{esc(p)}</p>")
 
     return "\n".join(html_blocks)
 
@@ -277,6 +425,12 @@ def main() -> int:
         default="data/entities.json",
         help="Path to curated people/orgs graph JSON with {nodes:[], links:[]}. This page is curated (no auto extraction).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(os.cpu_count() or 1, 4),
+        help="Worker processes for page text/image harvesting (1 disables multiprocessing)",
+    )
     # Intentionally no option to link/copy the source PDF into the website output.
     args = parser.parse_args()
 
@@ -297,16 +451,19 @@ def main() -> int:
     script_dir = Path(__file__).resolve().parent
     source_css = script_dir / "assets" / "style.css"
     if source_css.exists():
-        (assets_dir / "style.css").write_text(source_css.read_text(encoding="utf-8"), encoding="utf-8")
+        # Skip the copy when the output is already current; keeps its mtime stable across rebuilds.
+        dst_css = assets_dir / "style.css"
+        if not dst_css.exists() or dst_css.stat().st_mtime < source_css.stat().st_mtime:
+            dst_css.write_bytes(source_css.read_bytes())
 
     toc = _load_outline_toc(Path(args.structure))
-    doc = fitz.open(pdf_path)
+    # filetype="pdf" skips content sniffing; the input is always the report PDF.
+    doc = fitz.open(pdf_path, filetype="pdf")
     last_page = doc.page_count
     if args.max_pages and args.max_pages > 0:
         last_page = min(last_page, args.max_pages)
 
-    main_entries = _filter_main_report_entries(toc)
-    appendix_entries = _get_appendix_entries(toc)
+    main_entries, appendix_entries, level1_entries = _classify_toc(toc)
 
     # Explicit mapping from report outline to website pages.
     page_defs = [
@@ -331,31 +488,95 @@ def main() -> int:
     ]
 
     # Use *full* level-1 outline (including TOC/lists) for accurate boundaries.
-    ranges_all_level1 = _compute_level1_title_ranges(toc, last_page)
-
-    def nav_html(active_slug: str, *, in_pages_dir: bool) -> str:
-        items = []
+    ranges_all_level1 = {e.title: (e.page, end) for e, end in _compute_ranges(level1_entries, last_page)}
+
+    # Resolve each section title's (start,end) once; None when the outline lacks it.
+    resolved: dict[str, tuple[int, int] | None] = {
+        t: _get_range_for_title(ranges_all_level1=ranges_all_level1, title=t, last_page=last_page)
+        for _, _, section_titles in page_defs
+        for t in section_titles
+        if t != "Appendices"
+    }
+
+    # Extracts and figure lists from earlier runs, keyed by PDF identity plus each site
+    # page's section ranges; pages that hit the cache need no PyMuPDF work at all.
+    cache_path = out_dir / ".build-cache" / "sections.json"
+    section_cache = _load_cache(cache_path)
+    next_cache: dict[str, dict] = {}
+    pdf_stat = pdf_path.stat()
+    pdf_key = f"{_SECTION_CACHE_VERSION}:{pdf_stat.st_mtime_ns}:{pdf_stat.st_size}"
+
+    page_keys: dict[str, str] = {}
+    cached: dict[str, dict] = {}
+    for slug, _, section_titles in page_defs:
+        if slug in {"timeline", "people-orgs", "appendices"}:
+            continue  # curated pages; nothing extracted from the PDF
+        ranges = "|".join(
+            f"{resolved[t][0]}-{resolved[t][1]}:{t}" for t in section_titles if resolved.get(t)
+        )
+        key = page_keys[slug] = f"{pdf_key}:{slug}:{ranges}"
+        entry = section_cache.get(key)
+        if entry and all((out_dir / fi["src"]).is_file() for fi in entry["figures"]):
+            cached[slug] = entry
+
+    # One pass over every page still needed, harvesting text and image lists together;
+    # section ranges overlap, so nothing below loads a page again.
+    harvest_pages: list[int] = []
+    for slug, _, section_titles in page_defs:
+        if slug not in page_keys or slug in cached:
+            continue
+        for t in section_titles:
+            rng = resolved.get(t)
+            if rng:
+                harvest_pages.extend(range(rng[0] - 1, rng[1]))
+    # Content hash plus on-disk size/mtime of each text/HTML file from the last build.
+    # A file is only skipped when both the new content and the file itself match, so
+    # checkouts or hand edits are still overwritten; unchanged files keep their mtimes.
+    manifest_path = out_dir / ".build-manifest.json"
+    old_manifest = _load_cache(manifest_path)
+    manifest: dict[str, list] = {}
+
+    def write_output(path: Path, text: str) -> None:
+        key = path.relative_to(out_dir).as_posix()
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            st = None
+        if st is not None and old_manifest.get(key) == [digest, st.st_size, st.st_mtime_ns]:
+            manifest[key] = old_manifest[key]
+            return
+        path.write_text(text, encoding="utf-8")
+        st = path.stat()
+        manifest[key] = [digest, st.st_size, st.st_mtime_ns]
+
+    page_texts: dict[int, str] = {}
+    page_images: dict[int, list] = {}
+    if harvest_pages:
+        page_texts, page_images = _harvest_pages(pdf_path, harvest_pages, int(args.workers))
+
+    # Figure files already written to figures_dir, keyed by image content hash (shared across pages).
+    known_figures: dict[bytes, str] = {}
+    xref_cache: dict[int, str] = {}
+
+    # Nav links only depend on where the page lives; build both variants once and
+    # just mark the active item per page.
+    nav_links: dict[bool, list[tuple[str, str]]] = {}
+    for in_dir in (False, True):
+        items: list[tuple[str, str]] = []
         for slug, label, _ in page_defs:
             if slug == "overview":
-                href = "../index.html" if in_pages_dir else "index.html"
+                href = "../index.html" if in_dir else "index.html"
             else:
-                href = f"{slug}.html" if in_pages_dir else f"pages/{slug}.html"
-            prefix = "→ " if slug == active_slug else ""
-            items.append(f'<li>{prefix}<a href="{href}">{label}</a></li>')
-        return "<ul>" + "\n".join(items) + "</ul>"
-
-    # Write content extracts for each named section we’ll include.
-    def extract_sections(section_titles: list[str]) -> dict[str, str]:
-        out: dict[str, str] = {}
-        for t in section_titles:
-            if t == "Appendices":
-                continue
-            rng = _get_range_for_title(ranges_all_level1=ranges_all_level1, title=t, last_page=last_page)
-            if not rng:
-                continue
-            start, end = rng
-            out[t] = _clean_extracted_text(_extract_text_range(doc, start, end))
-        return out
+                href = f"{slug}.html" if in_dir else f"pages/{slug}.html"
+            items.append((slug, f'<a href="{href}">{label}</a></li>'))
+        nav_links[in_dir] = items
+
+    def nav_html(active_slug: str, *, in_pages_dir: bool) -> str:
+        return "<ul>" + "\n".join(
+            ("<li>→ " if slug == active_slug else "<li>") + link
+            for slug, link in nav_links[in_pages_dir]
+        ) + "</ul>"
 
     # Build pages.
     for slug, label, section_titles in page_defs:
@@ -369,7 +590,7 @@ def main() -> int:
                     "Create it (data/timeline-events.json) or pass --timeline-events <path>."
                 )
 
-            events_obj = json.loads(timeline_path.read_text(encoding="utf-8"))
+            events_obj = _loads(timeline_path.read_bytes())
             if not isinstance(events_obj, list):
                 raise SystemExit("Timeline events JSON must be a list of objects")
 
@@ -398,12 +619,15 @@ def main() -> int:
                     }
                 )
 
-            # Sort by ISO date when available; otherwise keep file order.
-            if all((n.get("date") or "").count("-") == 2 for n in norm):
-                norm.sort(key=lambda x: x.get("date") or "")
+            # Sort by ISO date when every event has one; otherwise keep file order.
+            # The key raises on the first missing/invalid date, so there's no separate check pass.
+            try:
+                norm = sorted(norm, key=lambda x: date.fromisoformat(x["date"]))
+            except ValueError:
+                pass
 
             events = norm
-            events_json = json.dumps(events, ensure_ascii=False)
+            events_json = _dumps(events)
 
             body = f"""
 <h1>{label}</h1>
@@ -498,7 +722,7 @@ def main() -> int:
                 body_html=body,
                 rel_prefix="../",
             )
-            (pages_dir / f"{slug}.html").write_text(html_out, encoding="utf-8")
+            write_output(pages_dir / f"{slug}.html", html_out)
             continue
 
         if slug == "people-orgs":
@@ -509,7 +733,7 @@ def main() -> int:
                     "Create it (data/entities.json) or pass --entities <path>."
                 )
 
-            entities_obj = json.loads(entities_path.read_text(encoding="utf-8"))
+            entities_obj = _loads(entities_path.read_bytes())
             if not isinstance(entities_obj, dict):
                 raise SystemExit("Entities JSON must be an object with keys: nodes, links")
             nodes_obj = entities_obj.get("nodes")
@@ -546,7 +770,7 @@ def main() -> int:
                 rel = str(l.get("relation") or "related to").strip()
                 links.append({"source": src, "target": tgt, "relation": rel})
 
-            entities_json = json.dumps({"nodes": nodes, "links": links}, ensure_ascii=False)
+            entities_json = _dumps({"nodes": nodes, "links": links})
 
             # Simple list for accessibility / quick scanning.
             rows = []
@@ -701,7 +925,7 @@ def main() -> int:
                 body_html=body,
                 rel_prefix="../",
             )
-            (pages_dir / f"{slug}.html").write_text(html_out, encoding="utf-8")
+            write_output(pages_dir / f"{slug}.html", html_out)
             continue
 
         if slug == "appendices":
@@ -726,91 +950,117 @@ def main() -> int:
                 body_html=body,
                 rel_prefix="../",
             )
-            (pages_dir / f"{slug}.html").write_text(html_out, encoding="utf-8")
+            write_output(pages_dir / f"{slug}.html", html_out)
             continue
 
-        extracts = extract_sections(section_titles)
-        # Persist raw extracts for traceability.
-        for title, txt in extracts.items():
-            (content_dir / f"{_slugify(title)}.txt").write_text(txt, encoding="utf-8")
-
-        # Render body.
-        body_bits = [f"<h1>{label}</h1>"]
-        body_bits.append("<p class=\"meta\">Content extracted from the report and organized for web reading.</p>")
+        entry = cached.get(slug)
+        if entry is not None:
+            extracts: dict[str, str] = entry["extracts"]
+            figure_items: list[dict] = entry["figures"]
+        else:
+            # One walk over the page's sections collects both the text extract and the
+            # figure gallery. For the hub pages (Analyses/System Background/Incident)
+            # figures come from the combined ranges, capped at 20.
+            extracts = {}
+            figure_items = []
+            gallery_srcs: set[str] = set()  # one gallery slot per image file
+            for t in section_titles:
+                rng = resolved.get(t)
+                if not rng:
+                    continue
+                start, end = rng
+                extracts[t] = _clean_extracted_text(_extract_text_range(page_texts, start, end))
 
-        # Extract some figures from the relevant page ranges and show as a gallery.
-        # For the hub pages (Analyses/System Background/Incident) we extract from the combined ranges.
-        figure_items: list[dict] = []
-        for t in section_titles:
-            if t == "Appendices":
-                continue
-            rng = _get_range_for_title(ranges_all_level1=ranges_all_level1, title=t, last_page=last_page)
-            if not rng:
-                continue
-            start, end = rng
-            if start > last_page:
-                continue
-            figure_items.extend(
-                _extract_images_for_range(
+                if len(figure_items) >= 20:
+                    continue
+                for fi in _extract_images_for_range(
                     doc=doc,
+                    page_images=page_images,
                     start_page=start,
                     end_page=end,
                     out_dir=figures_dir,
                     section_slug=_slugify(t),
+                    known_figures=known_figures,
+                    xref_cache=xref_cache,
                     min_pixels=160_000,
                     max_images=10 if slug == "overview" else 20,
-                )
-            )
-            if len(figure_items) >= 20:
-                break
+                ):
+                    if fi["src"] not in gallery_srcs:
+                        gallery_srcs.add(fi["src"])
+                        figure_items.append(fi)
+
+        next_cache[page_keys[slug]] = {"extracts": extracts, "figures": figure_items}
+
+        # Persist raw extracts for traceability.
+        for title, txt in extracts.items():
+            write_output(content_dir / f"{_slugify(title)}.txt", txt)
+
+        # Render body.
+        body = io.StringIO()
+        w = body.write
+
+        def add(fragment: str) -> None:
+            # Newline-separated fragments, same layout as the old "\n".join(...).
+            if body.tell():
+                body.write("\n")
+            body.write(fragment)
+
+        add(f"<h1>{label}</h1>")
+        add("<p class=\"meta\">Content extracted from the report and organized for web reading.</p>")
 
         if slug == "overview":
             es = extracts.get("Executive Summary", "")
-            body_bits.append("<div class=\"callout\"><h2>Executive Summary</h2>")
-            body_bits.append(_text_to_html_paragraphs(es[:12000] if es else ""))
-            body_bits.append("</div>")
+            add("<div class=\"callout\"><h2>Executive Summary</h2>")
+            add(_text_to_html_paragraphs(es[:12000] if es else ""))
+            add("</div>")
             if figure_items:
-                body_bits.append("<h2>Figures (extracted)</h2>")
-                gallery = "\n".join(
-                    f"<figure><a target=\"_blank\" href=\"{fi['src']}\"><img src=\"{fi['src']}\" alt=\"{fi['caption']}\"/></a><figcaption>{fi['caption']}</figcaption></figure>"
-                    for fi in figure_items[:8]
-                )
-                body_bits.append(f"<div class=\"gallery\">{gallery}</div>")
-            body_bits.append("<h2>Quick links</h2>")
-            body_bits.append("<div class=\"pills\">" + "".join(
-                (
-                    f"<a class=\"pill\" href=\"pages/{slug2}.html\">{lbl}</a>"
-                    if slug2 != "overview" else ""
-                )
-                for slug2, lbl, _ in page_defs
-                if lbl != "Overview"
-            ) + "</div>")
+                add("<h2>Figures (extracted)</h2>")
+                add("<div class=\"gallery\">")
+                for i, fi in enumerate(figure_items[:8]):
+                    if i:
+                        w("\n")
+                    w(f"<figure><a target=\"_blank\" href=\"{fi['src']}\"><img src=\"{fi['src']}\" alt=\"{fi['caption']}\"/></a><figcaption>{fi['caption']}</figcaption></figure>")
+                w("</div>")
+            add("<h2>Quick links</h2>")
+            add("<div class=\"pills\">")
+            for slug2, lbl, _ in page_defs:
+                if lbl != "Overview" and slug2 != "overview":
+                    w(f"<a class=\"pill\" href=\"pages/{slug2}.html\">{lbl}</a>")
+            w("</div>")
         else:
             if figure_items:
-                body_bits.append("<div class=\"callout\"><h2>Figures (extracted)</h2>")
-                gallery = "\n".join(
-                    f"<figure><a target=\"_blank\" href=\"../{fi['src']}\"><img src=\"../{fi['src']}\" alt=\"{fi['caption']}\"/></a><figcaption>{fi['caption']}</figcaption></figure>"
-                    for fi in figure_items[:12]
-                )
-                body_bits.append(f"<div class=\"gallery\">{gallery}</div></div>")
+                add("<div class=\"callout\"><h2>Figures (extracted)</h2>")
+                add("<div class=\"gallery\">")
+                for i, fi in enumerate(figure_items[:12]):
+                    if i:
+                        w("\n")
+                    w(f"<figure><a target=\"_blank\" href=\"../{fi['src']}\"><img src=\"../{fi['src']}\" alt=\"{fi['caption']}\"/></a><figcaption>{fi['caption']}</figcaption></figure>")
+                w("</div></div>")
             for t in section_titles:
                 txt = extracts.get(t, "")
                 if not txt:
                     continue
-                body_bits.append(f"<h2>{t}</h2>")
-                body_bits.append(_text_to_html_paragraphs(txt))
+                add(f"<h2>{t}</h2>")
+                add(_text_to_html_paragraphs(txt))
 
         html_out = _render_shell(
             title=f"{label} — BearsPaw Main Report",
             nav_html=nav_html(slug, in_pages_dir=in_pages_dir),
-            body_html="\n".join(body_bits),
+            body_html=body.getvalue(),
             rel_prefix="../" if in_pages_dir else "",
         )
 
         if slug == "overview":
-            (out_dir / "index.html").write_text(html_out, encoding="utf-8")
+            write_output(out_dir / "index.html", html_out)
         else:
-            (pages_dir / f"{slug}.html").write_text(html_out, encoding="utf-8")
+            write_output(pages_dir / f"{slug}.html", html_out)
+
+    # Release MuPDF's document and its cached page/image data before the final writes.
+    doc.close()
+
+    # Only entries used by this build are kept, so stale PDF revisions drop out.
+    _save_cache(cache_path, next_cache)
+    _save_cache(manifest_path, manifest)
 
     print(f"Built redesigned site: {out_dir / 'index.html'}")
     return 0
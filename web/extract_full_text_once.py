@@ -1,66 +1,164 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import fitz  # PyMuPDF
 
-# Reuse the TOC loader and slugify from the site generator.
-from build_redesigned_site import _load_outline_toc, _compute_level1_title_ranges, _slugify  # type: ignore
+# Reuse the TOC loader, skip list, slugify and per-process document handle from the
+# site generator.
+import build_redesigned_site  # type: ignore
+from build_redesigned_site import (  # type: ignore
+    _SKIP_MAIN_TITLES,
+    _compute_level1_title_ranges_ordered,
+    _init_worker,
+    _load_outline_toc,
+    _slugify,
+)
 
+try:
+    import orjson  # optional, faster JSON serializer
+except ImportError:
+    orjson = None
+
+
+# Text-only flags: no image-block collection in the TextPage.
+_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_IMAGES
 
-def _norm_newlines(s: str) -> str:
-    return s.replace("\r\n", "\n").replace("\r", "\n")
 
+# Lone CRs become LF; applied after CRLF is folded so CRLF doesn't turn into a blank line.
+_CR_TO_LF = str.maketrans("\r", "\n")
 
-def extract_level1_to_files(*, pdf: Path, structure: Path, out_dir: Path, max_pages: int = 0) -> Path:
+
+def _norm_newlines(s: str) -> str:
+    # MuPDF's plain text is already LF-only; don't copy the page twice for nothing.
+    if "\r" not in s:
+        return s
+    return s.replace("\r\n", "\n").translate(_CR_TO_LF)
+
+
+def _extract_one(title: str, start: int, end: int, cache_path: str) -> None:
+    """Extract one section's text into its cache file."""
+
+    doc = build_redesigned_site._worker_doc
+    assert doc is not None, "worker not initialized"
+    # Write under a temporary name so an interrupted run never leaves a truncated cache hit.
+    tmp_path = cache_path + ".tmp"
+
+    # Stream each page as pre-encoded UTF-8 into a large binary buffer: memory stays
+    # bounded on long appendices and there's no text-mode encoder per write.
+    with open(tmp_path, "wb", buffering=1 << 20) as f:
+        # Per-page hot loop: bind the writer and helpers to locals.
+        write = f.write
+        norm = _norm_newlines
+        flags = _TEXT_FLAGS
+        write(f"{title}\nPAGES {start}-{end}\n\n".encode("utf-8"))
+        # One sequential page iterator over the section instead of a lookup per page.
+        for p, page in enumerate(doc.pages(start - 1, end), start=start):
+            txt = norm(page.get_text("text", flags=flags)).strip()
+            if not txt:
+                continue
+            write(f"\n[PAGE {p}]\n{txt}\n".encode("utf-8"))
+
+    os.replace(tmp_path, cache_path)
+
+
+# Bump when the section file format changes so cached extracts are rebuilt.
+_TEXT_CACHE_VERSION = 1
+
+
+def _section_cache_key(pdf: Path, pdf_stat: os.stat_result, title: str, start: int, end: int) -> str:
+    raw = f"{_TEXT_CACHE_VERSION}|{pdf}|{pdf_stat.st_mtime_ns}|{pdf_stat.st_size}|{start}|{end}|{title}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    # Unlink first: dst may be a hardlink into another cache entry, which must not be overwritten.
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, dst)
+    except OSError:
+        # No hardlinks on this filesystem.
+        shutil.copyfile(src, dst)
+
+
+def extract_level1_to_files(
+    *,
+    pdf: Path,
+    structure: Path,
+    out_dir: Path,
+    max_pages: int = 0,
+    workers: int = 1,
+) -> Path:
     toc = _load_outline_toc(structure)
 
-    doc = fitz.open(pdf)
-    last_page = doc.page_count
+    with fitz.open(pdf) as doc:
+        page_count = doc.page_count
+    last_page = page_count
     if max_pages and max_pages > 0:
         last_page = min(last_page, max_pages)
 
-    ranges = _compute_level1_title_ranges(toc, last_page)
-
     out_dir.mkdir(parents=True, exist_ok=True)
     manifest: dict = {
         "pdf": str(pdf.name),
-        "pageCount": doc.page_count,
+        "pageCount": page_count,
         "extractedPageCap": last_page,
         "entries": [],
     }
 
-    # Only level-1 entries, in order, excluding TOC/list pages.
-    level1 = [e for e in toc if e.level == 1]
-
-    for e in level1:
-        title = e.title
-        if title.lower() in {"table of contents", "list of tables", "list of figures"}:
+    # Section text cached by PDF identity and range; unchanged sections are hardlinked
+    # from here instead of being extracted again.
+    cache_dir = out_dir / ".cache"
+    cache_dir.mkdir(exist_ok=True)
+    pdf_stat = pdf.stat()
+    # Per-entry paths are plain strings joined with os.path; no Path objects per section.
+    out_dir_s = os.fspath(out_dir)
+    cache_dir_s = os.fspath(cache_dir)
+
+    sections: list[tuple[str, str, int, int, str]] = []
+    # Only level-1 entries, in outline order, excluding TOC/list pages. The ranges come
+    # back positionally, so there's no by-title lookup (and no duplicate-title collisions).
+    for title, start, end in _compute_level1_title_ranges_ordered(toc, last_page):
+        if title.lower() in _SKIP_MAIN_TITLES:
             continue
-
-        start, end = ranges[title]
         if start > last_page:
             continue
         end = min(end, last_page)
 
-        slug = _slugify(title)
+        key = _section_cache_key(pdf, pdf_stat, title, start, end)
+        sections.append((title, _slugify(title), start, end, key))
+
+    # Sections are independent, so each worker extracts whole sections; only cache
+    # misses are dispatched.
+    misses: list[tuple[str, int, int, str]] = []
+    for title, _, start, end, key in sections:
+        cache_path = os.path.join(cache_dir_s, key)
+        if not os.path.isfile(cache_path):
+            misses.append((title, start, end, cache_path))
+    if misses:
+        titles, starts, ends, cache_paths = zip(*misses)
+        if workers <= 1:
+            _init_worker(str(pdf))
+            list(map(_extract_one, titles, starts, ends, cache_paths))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(str(pdf),),
+            ) as ex:
+                list(ex.map(_extract_one, titles, starts, ends, cache_paths))
+
+    for title, slug, start, end, key in sections:
         filename = f"p{start:03d}-{slug}.txt"
-        out_path = out_dir / filename
-
-        with out_path.open("w", encoding="utf-8") as f:
-            f.write(f"{title}\n")
-            f.write(f"PAGES {start}-{end}\n\n")
-            for p in range(start, end + 1):
-                page = doc.load_page(p - 1)
-                txt = _norm_newlines(page.get_text("text")).strip()
-                if not txt:
-                    continue
-                f.write(f"\n[PAGE {p}]\n")
-                f.write(txt)
-                f.write("\n")
-
+        _link_or_copy(os.path.join(cache_dir_s, key), os.path.join(out_dir_s, filename))
         manifest["entries"].append(
             {
                 "title": title,
@@ -71,8 +169,17 @@ def extract_level1_to_files(*, pdf: Path, structure: Path, out_dir: Path, max_pa
             }
         )
 
+    # Drop cache entries this run didn't use (older PDF revisions, changed ranges).
+    used = {key for *_, key in sections}
+    for entry in os.scandir(cache_dir):
+        if entry.name not in used:
+            os.unlink(entry.path)
+
     manifest_path = out_dir / "manifest.json"
-    manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    if orjson is not None:
+        manifest_path.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+    else:
+        manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
     return manifest_path
 
 
@@ -82,6 +189,12 @@ def main() -> int:
     ap.add_argument("--structure", required=True)
     ap.add_argument("--out", default="content_full")
     ap.add_argument("--max-pages", type=int, default=0, help="Optional cap for quicker runs")
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=min(os.cpu_count() or 1, 4),
+        help="Worker processes for section extraction (1 disables multiprocessing)",
+    )
     args = ap.parse_args()
 
     manifest = extract_level1_to_files(
@@ -89,6 +202,7 @@ def main() -> int:
         structure=Path(args.structure),
         out_dir=Path(args.out),
         max_pages=args.max_pages,
+        workers=int(args.workers),
     )
     print(f"Wrote manifest: {manifest}")
     return 0